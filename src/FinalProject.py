@@ -10,9 +10,13 @@ Author: Stefany Simplicio
 Date: December 2025
 """
 
+import contextlib
+import heapq
+import io
 import sys
 import os
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
 # Add current directory to Python path to import our modules
 sys.path.insert(0, os.path.dirname(__file__))
@@ -20,6 +24,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 # Import our modules
 from leonardo_kg import LeonardoKnowledgeGraph
 from graph_analysis import (
+    compute_layout,
     visualize_graph_with_categories,
     visualize_centrality,
     visualize_communities,
@@ -27,6 +32,14 @@ from graph_analysis import (
 )
 
 
+def _render_quietly(plot_function, *args, **kwargs) -> str:
+    """Run a plotting function and return what it printed instead of printing it."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        plot_function(*args, **kwargs)
+    return output.getvalue()
+
+
 def main():
     """Main function to run the complete analysis."""
     
@@ -39,7 +52,8 @@ def main():
     
     # Initialize graph
     print("\n📊 Initializing Knowledge Graph...")
-    kg = LeonardoKnowledgeGraph()
+    cache_dir = os.path.join(os.path.dirname(__file__), '..', 'cache')
+    kg = LeonardoKnowledgeGraph(cache_dir=cache_dir)
     
     # Load data
     print("\n📂 Loading data...")
@@ -58,6 +72,12 @@ def main():
         print(f"Current directory: {os.getcwd()}")
         return
     
+    # Compute the layout once and share it across all visualizations
+    pos = compute_layout(kg.graph)
+    
+    # Resolve concept names once instead of per lookup
+    names = kg.get_concept_names()
+    
     # Get basic statistics
     print("\n📈 Graph Statistics:")
     print("-" * 40)
@@ -72,25 +92,25 @@ def main():
     # Degree Centrality
     print("\n1. Degree Centrality (Top 10):")
     degree_centrality = kg.calculate_degree_centrality()
-    top_degree = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_degree = heapq.nlargest(10, degree_centrality.items(), key=lambda x: x[1])
     for i, (node_id, score) in enumerate(top_degree, 1):
-        node_name = kg.graph.nodes[node_id]['name']
+        node_name = names[node_id]
         print(f"   {i:2}. {node_name:30} {score:.4f}")
     
     # Betweenness Centrality
     print("\n2. Betweenness Centrality (Top 10):")
     betweenness = kg.calculate_betweenness_centrality()
-    top_betweenness = sorted(betweenness.items(), key=lambda x: x[1], reverse=True)[:10]
-    for i, (node_id, score) in enumerate(top_betweenness, 1):
-        node_name = kg.graph.nodes[node_id]['name']
+    top_betweenness = [(names[node_id], score) for node_id, score in
+                       heapq.nlargest(10, betweenness.items(), key=lambda x: x[1])]
+    for i, (node_name, score) in enumerate(top_betweenness, 1):
         print(f"   {i:2}. {node_name:30} {score:.4f}")
     
     # PageRank
     print("\n3. PageRank (Top 10):")
     pagerank = kg.calculate_pagerank()
-    top_pagerank = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)[:10]
-    for i, (node_id, score) in enumerate(top_pagerank, 1):
-        node_name = kg.graph.nodes[node_id]['name']
+    top_pagerank = [(names[node_id], score) for node_id, score in
+                    heapq.nlargest(10, pagerank.items(), key=lambda x: x[1])]
+    for i, (node_name, score) in enumerate(top_pagerank, 1):
         print(f"   {i:2}. {node_name:30} {score:.4f}")
     
     # Community Detection
@@ -101,7 +121,7 @@ def main():
     
     # Show community information
     for i, community in enumerate(communities[:5], 1):  # Show first 5 communities
-        community_names = [kg.graph.nodes[node_id]['name'] for node_id in community[:5]]
+        community_names = [names[node_id] for node_id in community[:5]]
         print(f"\nCommunity {i} ({len(community)} nodes):")
         print(f"  Examples: {', '.join(community_names)}")
     
@@ -116,28 +136,31 @@ def main():
             # Find paths between some central nodes
             central_nodes = [node_id for node_id, _ in top_degree[:4]]
             
+            # Search from all sources in one batched call
+            paths = kg.find_shortest_paths(central_nodes[:2], central_nodes[:3])
+            
             for i in range(min(2, len(central_nodes))):
                 for j in range(i+1, min(3, len(central_nodes))):
                     source = central_nodes[i]
                     target = central_nodes[j]
-                    path = kg.find_shortest_path(source, target)
+                    path = paths[(source, target)]
                     
                     if path:
-                        source_name = kg.graph.nodes[source]['name']
-                        target_name = kg.graph.nodes[target]['name']
+                        source_name = names[source]
+                        target_name = names[target]
                         print(f"\n{source_name} → {target_name}:")
                         print(f"  Path length: {len(path)-1} edges")
                         
                         # Show abbreviated path
                         if len(path) > 6:
                             path_display = (
-                                f"{kg.graph.nodes[path[0]]['name']} → "
-                                f"{kg.graph.nodes[path[1]]['name']} → ... → "
-                                f"{kg.graph.nodes[path[-2]]['name']} → "
-                                f"{kg.graph.nodes[path[-1]]['name']}"
+                                f"{names[path[0]]} → "
+                                f"{names[path[1]]} → ... → "
+                                f"{names[path[-2]]} → "
+                                f"{names[path[-1]]}"
                             )
                         else:
-                            path_display = " → ".join([kg.graph.nodes[node]['name'] for node in path])
+                            path_display = " → ".join([names[node] for node in path])
                         
                         print(f"  Path: {path_display}")
     
@@ -146,7 +169,7 @@ def main():
     print("-" * 40)
     mst_edges = kg.calculate_mst()
     print(f"Number of edges in MST: {len(mst_edges)}")
-    print(f"MST contains {len(set().union(*mst_edges))} nodes")
+    print(f"MST contains {len(set(chain.from_iterable(mst_edges)))} nodes")
     
     # Visualization
     print("\n🎨 Generating Visualizations...")
@@ -155,29 +178,41 @@ def main():
     # Adjust output paths to be relative to current directory
     output_dir = os.path.join(os.path.dirname(__file__), '..', 'output')
     
-    # 1. Graph by category
-    visualize_graph_with_categories(kg.graph, os.path.join(output_dir, 'graph_by_category.png'))
-    
-    # 2. Centrality visualizations
-    visualize_centrality(kg.graph, degree_centrality, 
-                        "Degree Centrality", os.path.join(output_dir, 'degree_centrality.png'))
-    
-    visualize_centrality(kg.graph, pagerank,
-                        "PageRank Centrality", os.path.join(output_dir, 'pagerank_centrality.png'))
-    
-    # 3. Community visualization
-    visualize_communities(kg.graph, communities, os.path.join(output_dir, 'communities.png'))
-    
-    # 4. Create summary plot
     results = {
         'stats': stats,
-        'top_pagerank': [(kg.graph.nodes[node_id]['name'], score) 
-                         for node_id, score in top_pagerank],
-        'top_betweenness': [(kg.graph.nodes[node_id]['name'], score) 
-                           for node_id, score in top_betweenness],
+        'top_pagerank': top_pagerank,
+        'top_betweenness': top_betweenness,
         'communities': communities
     }
-    create_summary_plot(results, os.path.join(output_dir, 'summary_analysis.png'))
+    
+    # The plots share no state, so render them in parallel processes; the
+    # workers' status lines are printed here, in order, so they never interleave
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        futures = [
+            # 1. Graph by category
+            executor.submit(_render_quietly, visualize_graph_with_categories, kg.graph,
+                            os.path.join(output_dir, 'graph_by_category.png'),
+                            pos=pos, names=names),
+            
+            # 2. Centrality visualizations
+            executor.submit(_render_quietly, visualize_centrality, kg.graph, degree_centrality,
+                            "Degree Centrality", os.path.join(output_dir, 'degree_centrality.png'),
+                            pos=pos, names=names),
+            executor.submit(_render_quietly, visualize_centrality, kg.graph, pagerank,
+                            "PageRank Centrality", os.path.join(output_dir, 'pagerank_centrality.png'),
+                            pos=pos, names=names),
+            
+            # 3. Community visualization
+            executor.submit(_render_quietly, visualize_communities, kg.graph, communities,
+                            os.path.join(output_dir, 'communities.png'),
+                            pos=pos, names=names),
+            
+            # 4. Create summary plot
+            executor.submit(_render_quietly, create_summary_plot, results,
+                            os.path.join(output_dir, 'summary_analysis.png')),
+        ]
+        for future in futures:
+            print(future.result(), end='')
     
     # Export to GEXF for external tools
     kg.export_to_gexf(os.path.join(output_dir, 'leonardo_graph.gexf'))
@@ -193,19 +228,17 @@ def main():
     # Most central concept
     if top_degree:
         most_central_id, most_central_score = top_degree[0]
-        most_central_name = kg.graph.nodes[most_central_id]['name']
+        most_central_name = names[most_central_id]
         print(f"1. Most central concept: {most_central_name} (Degree: {most_central_score:.4f})")
     
     # Concept with highest betweenness
     if top_betweenness:
-        highest_betweenness_id, highest_betweenness_score = top_betweenness[0]
-        highest_betweenness_name = kg.graph.nodes[highest_betweenness_id]['name']
+        highest_betweenness_name, highest_betweenness_score = top_betweenness[0]
         print(f"2. Highest betweenness: {highest_betweenness_name} ({highest_betweenness_score:.4f})")
     
     # Concept with highest PageRank
     if top_pagerank:
-        highest_pagerank_id, highest_pagerank_score = top_pagerank[0]
-        highest_pagerank_name = kg.graph.nodes[highest_pagerank_id]['name']
+        highest_pagerank_name, highest_pagerank_score = top_pagerank[0]
         print(f"3. Highest PageRank: {highest_pagerank_name} ({highest_pagerank_score:.4f})")
     
     print(f"4. Number of communities: {len(communities)}")
@@ -4,14 +4,83 @@ Graph Analysis Utilities
 Helper functions for analyzing and visualizing the knowledge graph.
 """
 
+import heapq
 import networkx as nx
+import matplotlib
+matplotlib.use('Agg')  # plots are only written to files
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
-from typing import Dict, List, Any
+from collections import defaultdict
+from typing import Dict, List, Any, Optional
 import numpy as np
 
+try:
+    import pygraphviz  # noqa: F401  (enables the graphviz sfdp layout)
+    _HAS_PYGRAPHVIZ = True
+except ImportError:
+    _HAS_PYGRAPHVIZ = False
 
-def visualize_graph_with_categories(graph: nx.DiGraph, output_path: str = 'output/graph_by_category.png') -> None:
+# Graphs above this size are laid out with graphviz sfdp when available
+SFDP_NODE_THRESHOLD = 500
+
+
+def compute_layout(graph: nx.DiGraph, seed: int = 42, k: float = 0.9,
+                   iterations: Optional[int] = None) -> Dict[Any, Any]:
+    """
+    Compute node positions for the visualizations.
+    
+    Large graphs are laid out with graphviz's sfdp engine when pygraphviz
+    is installed. Otherwise a spring layout is run. For weakly connected
+    graphs it starts from the spectral layout, which needs far fewer
+    force-directed iterations than a random start; disconnected graphs
+    start from the seeded random layout, because the spectral layout
+    places each component on a single point.
+    
+    Parameters
+    ----------
+    graph : nx.DiGraph
+        The graph to lay out
+    seed : int, optional
+        Random seed for the spring layout (default=42)
+    k : float, optional
+        Optimal distance between nodes (default=0.9)
+    iterations : int, optional
+        Number of spring layout iterations (default=None, 20 from a
+        spectral start and 50 from a random start)
+        
+    Returns
+    -------
+    dict
+        Dictionary mapping node ID to (x, y) position
+    """
+    if graph.number_of_nodes() > SFDP_NODE_THRESHOLD and _HAS_PYGRAPHVIZ:
+        return nx.nx_agraph.graphviz_layout(graph, prog='sfdp')
+    
+    initial_pos = None
+    if graph.number_of_nodes() > 2 and nx.is_connected(graph.to_undirected(as_view=True)):
+        initial_pos = nx.spectral_layout(graph)
+    if iterations is None:
+        iterations = 50 if initial_pos is None else 20
+    return nx.spring_layout(graph, pos=initial_pos, seed=seed, k=k, iterations=iterations)
+
+
+def _node_names(graph: nx.DiGraph) -> Dict[str, str]:
+    """Map every node ID to its concept name."""
+    return {node: attr['name'] for node, attr in graph.nodes(data=True)}
+
+
+def _prepare_axes(ax: Optional[plt.Axes]):
+    """Return (figure, axes, created), creating a new figure when ``ax`` is None."""
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(14, 12))
+        return fig, ax, True
+    return ax.figure, ax, False
+
+
+def visualize_graph_with_categories(graph: nx.DiGraph, output_path: str = 'output/graph_by_category.png',
+                                    pos: Optional[Dict[Any, Any]] = None, dpi: int = 150,
+                                    ax: Optional[plt.Axes] = None,
+                                    names: Optional[Dict[str, str]] = None) -> None:
     """
     Visualize graph with nodes colored by category.
     
@@ -21,8 +90,20 @@ def visualize_graph_with_categories(graph: nx.DiGraph, output_path: str = 'outpu
         The graph to visualize
     output_path : str
         Path to save the visualization
+    pos : dict, optional
+        Precomputed node positions; computed with compute_layout if omitted
+    dpi : int, optional
+        Resolution of the saved image (default=150)
+    ax : matplotlib.axes.Axes, optional
+        Axes to draw on, so one figure can be reused across plots;
+        a new figure is created and closed if omitted
+    names : dict, optional
+        Precomputed mapping of node ID to concept name; read from the
+        node attributes if omitted
     """
-    plt.figure(figsize=(14, 12))
+    fig, ax, created = _prepare_axes(ax)
+    if names is None:
+        names = _node_names(graph)
     
     # Define category colors
     category_colors = {
@@ -35,14 +116,19 @@ def visualize_graph_with_categories(graph: nx.DiGraph, output_path: str = 'outpu
     }
     
     # Get positions
-    pos = nx.spring_layout(graph, seed=42, k=0.9)
+    if pos is None:
+        pos = compute_layout(graph)
+    
+    # Index nodes by category in a single pass
+    nodes_by_category = defaultdict(list)
+    for n, attr in graph.nodes(data=True):
+        nodes_by_category[attr.get('category')].append(n)
     
     # Draw nodes by category
     for category, color in category_colors.items():
-        nodes = [n for n, attr in graph.nodes(data=True) 
-                if attr.get('category') == category]
+        nodes = nodes_by_category.get(category)
         if nodes:
-            nx.draw_networkx_nodes(graph, pos, 
+            nx.draw_networkx_nodes(graph, pos, ax=ax,
                                   nodelist=nodes,
                                   node_color=color,
                                   label=category,
@@ -50,30 +136,35 @@ def visualize_graph_with_categories(graph: nx.DiGraph, output_path: str = 'outpu
                                   alpha=0.8)
     
     # Draw edges
-    nx.draw_networkx_edges(graph, pos, 
+    # Straight arrows avoid building a Bezier curve for every edge
+    nx.draw_networkx_edges(graph, pos, ax=ax,
                           edge_color='gray',
                           alpha=0.3,
                           arrows=True,
-                          arrowsize=10,
-                          connectionstyle="arc3,rad=0.1")
+                          arrowstyle='-|>',
+                          arrowsize=10)
     
     # Add labels for important nodes
     degrees = dict(graph.degree())
-    important_nodes = sorted(degrees.items(), key=lambda x: x[1], reverse=True)[:15]
-    labels = {node: graph.nodes[node]['name'] for node, _ in important_nodes}
-    nx.draw_networkx_labels(graph, pos, labels, font_size=9)
+    important_nodes = heapq.nlargest(15, degrees.items(), key=lambda x: x[1])
+    labels = {node: names[node] for node, _ in important_nodes}
+    nx.draw_networkx_labels(graph, pos, labels, font_size=9, ax=ax)
     
-    plt.title("Leonardo da Vinci Knowledge Graph by Category", fontsize=16, fontweight='bold')
-    plt.legend(loc='upper left')
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.set_title("Leonardo da Vinci Knowledge Graph by Category", fontsize=16, fontweight='bold')
+    ax.legend(loc='upper left')
+    ax.axis('off')
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    if created:
+        plt.close(fig)
     print(f"Category visualization saved to {output_path}")
 
 
 def visualize_centrality(graph: nx.DiGraph, centrality_scores: Dict[str, float], 
-                        title: str, output_path: str) -> None:
+                        title: str, output_path: str,
+                        pos: Optional[Dict[Any, Any]] = None, dpi: int = 150,
+                        ax: Optional[plt.Axes] = None,
+                        names: Optional[Dict[str, str]] = None) -> None:
     """
     Visualize graph with node size based on centrality scores.
     
@@ -87,44 +178,64 @@ def visualize_centrality(graph: nx.DiGraph, centrality_scores: Dict[str, float],
         Title for the visualization
     output_path : str
         Path to save the visualization
+    pos : dict, optional
+        Precomputed node positions; computed with compute_layout if omitted
+    dpi : int, optional
+        Resolution of the saved image (default=150)
+    ax : matplotlib.axes.Axes, optional
+        Axes to draw on, so one figure can be reused across plots;
+        a new figure is created and closed if omitted
+    names : dict, optional
+        Precomputed mapping of node ID to concept name; read from the
+        node attributes if omitted
     """
-    plt.figure(figsize=(14, 12))
+    fig, ax, created = _prepare_axes(ax)
+    if names is None:
+        names = _node_names(graph)
     
     # Get positions
-    pos = nx.spring_layout(graph, seed=42, k=0.9)
+    if pos is None:
+        pos = compute_layout(graph)
     
     # Normalize centrality scores for node sizes
     max_score = max(centrality_scores.values()) if centrality_scores.values() else 1
-    node_sizes = [centrality_scores.get(node, 0) * 5000 / max_score + 100 
-                  for node in graph.nodes()]
+    scores = np.fromiter((centrality_scores.get(node, 0.0) for node in graph.nodes()),
+                         dtype=np.float32, count=graph.number_of_nodes())
+    node_sizes = scores * np.float32(5000.0 / max_score) + np.float32(100.0)
     
     # Draw graph
-    nx.draw_networkx_nodes(graph, pos, 
+    nx.draw_networkx_nodes(graph, pos, ax=ax,
                           node_size=node_sizes,
                           node_color='#4285F4',
                           alpha=0.7)
     
-    nx.draw_networkx_edges(graph, pos,
-                          edge_color='gray',
-                          alpha=0.2,
-                          arrows=False)
+    edges = nx.draw_networkx_edges(graph, pos, ax=ax,
+                                  edge_color='gray',
+                                  alpha=0.2,
+                                  arrows=False)
+    if graph.number_of_edges() > 0:  # NetworkX returns an empty list otherwise
+        edges.set_rasterized(True)
     
     # Label top nodes
-    top_nodes = sorted(centrality_scores.items(), key=lambda x: x[1], reverse=True)[:10]
-    top_labels = {node: graph.nodes[node]['name'] for node, _ in top_nodes}
-    nx.draw_networkx_labels(graph, pos, top_labels, font_size=10, font_weight='bold',
+    top_nodes = heapq.nlargest(10, centrality_scores.items(), key=lambda x: x[1])
+    top_labels = {node: names[node] for node, _ in top_nodes}
+    nx.draw_networkx_labels(graph, pos, top_labels, font_size=10, font_weight='bold', ax=ax,
                            bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
     
-    plt.title(title, fontsize=16, fontweight='bold')
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.set_title(title, fontsize=16, fontweight='bold')
+    ax.axis('off')
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    if created:
+        plt.close(fig)
     print(f"Centrality visualization saved to {output_path}")
 
 
 def visualize_communities(graph: nx.DiGraph, communities: List[List[str]], 
-                         output_path: str = 'output/communities.png') -> None:
+                         output_path: str = 'output/communities.png',
+                         pos: Optional[Dict[Any, Any]] = None, dpi: int = 150,
+                         ax: Optional[plt.Axes] = None,
+                         names: Optional[Dict[str, str]] = None) -> None:
     """
     Visualize graph with communities.
     
@@ -136,18 +247,31 @@ def visualize_communities(graph: nx.DiGraph, communities: List[List[str]],
         List of communities
     output_path : str
         Path to save the visualization
+    pos : dict, optional
+        Precomputed node positions; computed with compute_layout if omitted
+    dpi : int, optional
+        Resolution of the saved image (default=150)
+    ax : matplotlib.axes.Axes, optional
+        Axes to draw on, so one figure can be reused across plots;
+        a new figure is created and closed if omitted
+    names : dict, optional
+        Precomputed mapping of node ID to concept name; read from the
+        node attributes if omitted
     """
-    plt.figure(figsize=(14, 12))
+    fig, ax, created = _prepare_axes(ax)
+    if names is None:
+        names = _node_names(graph)
     
     # Get positions
-    pos = nx.spring_layout(graph, seed=42, k=0.9)
+    if pos is None:
+        pos = compute_layout(graph)
     
     # Create color map for communities
     colors = cm.rainbow(np.linspace(0, 1, len(communities)))
     
     # Draw each community with different color
     for i, community in enumerate(communities):
-        nx.draw_networkx_nodes(graph, pos,
+        nx.draw_networkx_nodes(graph, pos, ax=ax,
                               nodelist=community,
                               node_color=[colors[i]],
                               node_size=300,
@@ -155,33 +279,37 @@ def visualize_communities(graph: nx.DiGraph, communities: List[List[str]],
                               label=f'Community {i+1}')
     
     # Draw edges
-    nx.draw_networkx_edges(graph, pos,
-                          edge_color='gray',
-                          alpha=0.2,
-                          arrows=False)
+    edges = nx.draw_networkx_edges(graph, pos, ax=ax,
+                                  edge_color='gray',
+                                  alpha=0.2,
+                                  arrows=False)
+    if graph.number_of_edges() > 0:  # NetworkX returns an empty list otherwise
+        edges.set_rasterized(True)
     
     # Label community representatives
+    degrees = dict(graph.degree())
     labels = {}
     for i, community in enumerate(communities[:5]):  # Label first 5 communities
         if community:
             # Get the node with highest degree in community
-            community_degrees = [(node, graph.degree(node)) for node in community]
-            top_node = max(community_degrees, key=lambda x: x[1])[0]
-            labels[top_node] = f"C{i+1}: {graph.nodes[top_node]['name'][:15]}..."
+            top_node = max(community, key=degrees.get)
+            labels[top_node] = f"C{i+1}: {names[top_node][:15]}..."
     
-    nx.draw_networkx_labels(graph, pos, labels, font_size=9, font_weight='bold',
+    nx.draw_networkx_labels(graph, pos, labels, font_size=9, font_weight='bold', ax=ax,
                            bbox=dict(boxstyle="round,pad=0.3", facecolor="white", alpha=0.8))
     
-    plt.title(f"Community Detection ({len(communities)} Communities)", fontsize=16, fontweight='bold')
-    plt.legend(loc='upper left')
-    plt.axis('off')
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.set_title(f"Community Detection ({len(communities)} Communities)", fontsize=16, fontweight='bold')
+    ax.legend(loc='upper left')
+    ax.axis('off')
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    if created:
+        plt.close(fig)
     print(f"Community visualization saved to {output_path}")
 
 
-def create_summary_plot(results: Dict[str, Any], output_path: str = 'output/summary.png') -> None:
+def create_summary_plot(results: Dict[str, Any], output_path: str = 'output/summary.png',
+                        dpi: int = 300) -> None:
     """
     Create a summary plot of analysis results.
     
@@ -191,6 +319,8 @@ def create_summary_plot(results: Dict[str, Any], output_path: str = 'output/summ
         Dictionary containing analysis results
     output_path : str
         Path to save the summary plot
+    dpi : int, optional
+        Resolution of the saved image (default=300)
     """
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
     
@@ -224,7 +354,8 @@ def create_summary_plot(results: Dict[str, Any], output_path: str = 'output/summ
     ax = axes[1, 0]
     communities = results.get('communities', [])
     if communities:
-        sizes = [len(comm) for comm in communities]
+        sizes = np.fromiter((len(comm) for comm in communities), dtype=np.int32,
+                            count=len(communities))
         colors = cm.rainbow(np.linspace(0, 1, len(sizes)))
         ax.bar(range(1, len(sizes) + 1), sizes, color=colors)
         ax.set_xlabel('Community ID')
@@ -252,6 +383,6 @@ Communities: {len(communities)}"""
     plt.suptitle('Leonardo da Vinci Knowledge Graph - Analysis Summary', 
                 fontsize=18, fontweight='bold')
     plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     plt.close()
     print(f"Summary plot saved to {output_path}")
\ No newline at end of file
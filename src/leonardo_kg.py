@@ -4,10 +4,176 @@ Leonardo da Vinci Knowledge Graph Module
 This module contains the main graph class for analyzing Leonardo's concepts.
 """
 
+import functools
+import gzip
+import hashlib
+import multiprocessing
+import os
+import pickle
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 import networkx as nx
+from networkx.utils import UnionFind
+import numpy as np
 import pandas as pd
+from scipy import sparse
+from scipy.sparse.csgraph import dijkstra, minimum_spanning_tree
 from typing import Dict, List, Tuple, Optional, Any
-import community as community_louvain  # python-louvain
+
+try:
+    import igraph  # optional C backend for centrality and community detection
+except ImportError:
+    igraph = None
+
+try:
+    import leidenalg  # optional Leiden community detection on top of igraph
+except ImportError:
+    leidenalg = None
+
+try:
+    import pyarrow as pa  # optional Arrow CSV reader for the loaders
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
+
+# Bump when a cached method's results change meaning, to retire old entries
+_CACHE_VERSION = 2
+
+# Graphs above this size use sampled (approximate) betweenness by default
+APPROX_BETWEENNESS_THRESHOLD = 2000
+
+# Column types for the input CSVs; explicit string and categorical dtypes
+# avoid inferring generic object columns. Weights stay float64 on the graph
+# (they are Python floats there anyway) and are narrowed only in build_csr
+_CONCEPT_DTYPES = {'id': 'string', 'name': 'string', 'category': 'category', 'description': 'string'}
+_RELATIONSHIP_DTYPES = {'source': 'string', 'target': 'string', 'relationship': 'category',
+                        'weight': 'float64'}
+
+# Graph shared by the betweenness worker processes, set once per worker
+_worker_graph = None
+
+
+def _init_betweenness_worker(graph: nx.DiGraph) -> None:
+    """Store the graph in a worker process of the betweenness pool."""
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _betweenness_chunk(sources: List[str]) -> Dict[str, float]:
+    """Unnormalized betweenness contributions of shortest paths from ``sources``."""
+    return nx.betweenness_centrality_subset(
+        _worker_graph, sources=sources, targets=list(_worker_graph), normalized=False)
+
+
+# Knowledge graph shared by the centrality worker processes, set once per worker
+_worker_kg = None
+
+
+def _init_centrality_worker(payload: bytes) -> None:
+    """Unpickle the knowledge graph once in a worker of the centrality pool."""
+    global _worker_kg
+    _worker_kg = pickle.loads(payload)
+
+
+def _run_centrality(method: str, kwargs: Dict[str, Any]) -> Dict[str, float]:
+    """Call one ``calculate_*`` method on the worker's knowledge graph."""
+    return getattr(_worker_kg, method)(**kwargs)
+
+
+def _arrow_type(dtype: str) -> "pa.DataType":
+    """Translate a pandas dtype name from the column maps to an Arrow type."""
+    if dtype == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string() if dtype == 'string' else pa.from_numpy_dtype(np.dtype(dtype))
+
+
+def _read_csv_columns(filepath: str, dtypes: Dict[str, str]) -> Dict[str, list]:
+    """
+    Read a CSV file into a dict of column lists.
+    
+    With pyarrow the file is parsed into Arrow's columnar buffers and
+    converted column by column, without building a DataFrame; otherwise
+    pandas is used.
+    """
+    if pacsv is not None:
+        options = pacsv.ConvertOptions(
+            column_types={column: _arrow_type(dtype) for column, dtype in dtypes.items()})
+        return pacsv.read_csv(filepath, convert_options=options).to_pydict()
+    
+    df = pd.read_csv(filepath, dtype=dtypes)
+    return {column: df[column].tolist() for column in df.columns}
+
+
+def _as_list(values: Any) -> list:
+    """Convert a column to a list of Python scalars (``tolist`` avoids per-item indexing)."""
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def _memo_key(name: str, version: int, args: tuple, kwargs: Dict[str, Any]) -> tuple:
+    """Key of a ``_memoize`` cache entry."""
+    return (name, version, args, frozenset(kwargs.items()))
+
+
+def _memoize(method):
+    """
+    Cache a method's result in memory for the current graph version.
+    
+    The key combines the method name, ``self._version`` and the call
+    arguments; the loaders bump the version, so results never outlive
+    the graph they were computed on.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = _memo_key(method.__name__, self._version, args, kwargs)
+        if key not in self._cache:
+            self._cache[key] = method(self, *args, **kwargs)
+        return self._cache[key]
+    return wrapper
+
+
+def _disk_cached(method):
+    """
+    Persist a method's result under ``self.cache_dir``.
+    
+    The cache file name is a hash of the graph's nodes and weighted edges,
+    the method name and its arguments, ``_CACHE_VERSION`` and the backends
+    in use, so any change to the graph, the parameters or the algorithms
+    produces a new entry. Files are written atomically, and unreadable
+    ones are treated as a cache miss. Caching is disabled when
+    ``cache_dir`` is None.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.cache_dir is None:
+            return method(self, *args, **kwargs)
+        
+        digest = hashlib.blake2b(self._graph_fingerprint(), digest_size=16)
+        digest.update(repr((_CACHE_VERSION, igraph is not None, self._louvain_backend,
+                            method.__name__, args, sorted(kwargs.items()))).encode())
+        path = os.path.join(self.cache_dir, f"{digest.hexdigest()}.pkl")
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except (EOFError, pickle.UnpicklingError):
+            print(f"Ignoring corrupt cache file {path}")
+        
+        result = method(self, *args, **kwargs)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temporary file first so an interrupted run never
+        # leaves a truncated entry behind
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(result, f, protocol=5)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return result
+    return wrapper
 
 
 class LeonardoKnowledgeGraph:
@@ -21,14 +187,196 @@ class LeonardoKnowledgeGraph:
     Attributes
     ----------
     graph : nx.DiGraph
-        The directed graph containing concepts and relationships
+        Read-only view of the directed graph containing concepts and
+        relationships; use the ``load_*``/``add_*_batch`` methods to extend it
+    cache_dir : str or None
+        Directory where centrality and community results are cached
+        between runs, or None to disable the cache
+    
+    Notes
+    -----
+    Concept names, categories and descriptions are also kept in columnar
+    NumPy arrays (categories as int32 codes), which ``get_node_info`` and
+    ``get_concept_names`` read. The per-node attribute dicts on ``graph``
+    are kept as well, because the visualizations and the GEXF export read
+    them; both stores reference the same string objects, so the columns
+    add one pointer array each rather than halving memory use.
+    
+    Statistics, centralities and the MST are also cached in memory until
+    the next ``load_*``/``add_*_batch`` call. ``graph`` is a frozen view so
+    that structural changes cannot bypass that invalidation; node and edge
+    attributes should be treated as read-only as well. The returned
+    dicts and lists are shared with the cache and should not be modified.
     """
     
-    def __init__(self):
-        """Initialize an empty directed graph."""
-        self.graph = nx.DiGraph()
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize an empty directed graph.
+        
+        Parameters
+        ----------
+        cache_dir : str, optional
+            Directory for caching expensive results across runs
+            (default=None, no caching)
+        """
+        self._graph = nx.DiGraph()
+        self._graph_view = self._graph.copy(as_view=True)
+        self.cache_dir = cache_dir
+        self._igraph = None
+        self._csr = None
+        self._nodes = []
+        self._node_index = {}
+        self._predecessors = {}
+        self._version = 0
+        self._cache: Dict[tuple, Any] = {}
+        self._components = UnionFind()
+        self._n_components = 0
+        self._n_edges = 0
+        self._louvain_backend = self._probe_louvain_backend()
+        self._id_to_idx: Dict[str, int] = {}
+        self._meta = {
+            'name': np.empty(0, dtype=object),
+            'category': np.empty(0, dtype=np.int32),
+            'description': np.empty(0, dtype=object),
+        }
+        self._meta_size = 0
+        self._category_labels: List[str] = []
+        self._category_codes: Dict[str, int] = {}
         print("Leonardo Knowledge Graph initialized")
     
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the derived caches; they are rebuilt on demand."""
+        state = self.__dict__.copy()
+        state.update(_igraph=None, _csr=None, _nodes=[], _node_index={},
+                     _predecessors={}, _cache={})
+        return state
+    
+    @property
+    def graph(self) -> nx.DiGraph:
+        """Read-only view of the concept graph."""
+        return self._graph_view
+    
+    def add_concepts_batch(self, ids: np.ndarray, names: np.ndarray,
+                           categories: np.ndarray, descriptions: np.ndarray) -> None:
+        """
+        Add concepts as nodes from column arrays.
+        
+        Each argument is one column, so callers can pass NumPy arrays
+        (or any sequences) directly without building a DataFrame.
+        
+        Parameters
+        ----------
+        ids : np.ndarray
+            Concept IDs
+        names : np.ndarray
+            Concept names
+        categories : np.ndarray
+            Concept categories
+        descriptions : np.ndarray
+            Concept descriptions
+        """
+        ids, names = _as_list(ids), _as_list(names)
+        categories, descriptions = _as_list(categories), _as_list(descriptions)
+        
+        attributes = [{'name': n, 'category': c, 'description': d}
+                      for n, c, d in zip(names, categories, descriptions)]
+        self._track_nodes(ids)
+        self._graph.add_nodes_from(zip(ids, attributes))
+        self._store_metadata(ids, names, categories, descriptions)
+        self._invalidate_caches()
+    
+    def _store_metadata(self, ids: list, names: list, categories: list, descriptions: list) -> None:
+        """
+        Write concept metadata into the columnar sidecar arrays.
+        
+        Rows are indexed by ``self._id_to_idx``; known IDs are overwritten
+        in place and new IDs are appended. The arrays grow geometrically,
+        so a series of batches costs amortized O(1) per concept. Categories
+        are stored as int32 codes into ``self._category_labels``.
+        """
+        rows = np.fromiter((self._id_to_idx.setdefault(node_id, len(self._id_to_idx))
+                            for node_id in ids), dtype=np.intp, count=len(ids))
+        size = len(self._id_to_idx)
+        
+        capacity = len(self._meta['name'])
+        if size > capacity:
+            capacity = max(size, 2 * capacity, 16)
+            for column, array in self._meta.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:len(array)] = array
+                self._meta[column] = grown
+        
+        codes = []
+        for category in categories:
+            code = self._category_codes.get(category)
+            if code is None:
+                code = self._category_codes[category] = len(self._category_labels)
+                self._category_labels.append(category)
+            codes.append(code)
+        
+        for column, values in (('name', names), ('category', codes), ('description', descriptions)):
+            self._meta[column][rows] = values
+        self._meta_size = size
+    
+    def get_concept_names(self) -> Dict[str, str]:
+        """
+        Get the name of every loaded concept.
+        
+        Returns
+        -------
+        dict
+            Dictionary mapping concept ID to name, read from the columnar
+            metadata without touching the per-node attribute dicts
+        """
+        return dict(zip(self._id_to_idx, self._meta['name'][:self._meta_size].tolist()))
+    
+    def add_relationships_batch(self, sources: np.ndarray, targets: np.ndarray,
+                                relationships: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Add relationships as edges from column arrays.
+        
+        Parameters
+        ----------
+        sources : np.ndarray
+            Source concept IDs
+        targets : np.ndarray
+            Target concept IDs
+        relationships : np.ndarray
+            Relationship types
+        weights : np.ndarray
+            Relationship weights
+        """
+        sources, targets = _as_list(sources), _as_list(targets)
+        attributes = [{'relationship': r, 'weight': w}
+                      for r, w in zip(_as_list(relationships), _as_list(weights))]
+        self._track_edges(sources, targets)
+        self._graph.add_edges_from(zip(sources, targets, attributes))
+        self._invalidate_caches()
+    
+    def _track_nodes(self, nodes: list) -> None:
+        """Register new nodes in the component union-find as singletons."""
+        for node in nodes:
+            if node not in self._components.parents:
+                self._components[node]
+                self._n_components += 1
+    
+    def _track_edges(self, sources: list, targets: list) -> None:
+        """
+        Update the edge count and weakly connected components for edges
+        that are about to be added, before they reach the graph.
+        """
+        self._track_nodes(sources)
+        self._track_nodes(targets)
+        new_edges = set()
+        for u, v in zip(sources, targets):
+            if not self.graph.has_edge(u, v):
+                new_edges.add((u, v))
+            root_u, root_v = self._components[u], self._components[v]
+            if root_u != root_v:
+                self._components.union(root_u, root_v)
+                self._n_components -= 1
+        self._n_edges += len(new_edges)
+    
     def load_concepts(self, filepath: str) -> None:
         """
         Load concepts from a CSV file and add them as nodes.
@@ -40,16 +388,11 @@ class LeonardoKnowledgeGraph:
             Expected columns: id, name, category, description
         """
         try:
-            df = pd.read_csv(filepath)
+            columns = _read_csv_columns(filepath, _CONCEPT_DTYPES)
             
-            for _, row in df.iterrows():
-                self.graph.add_node(
-                    row['id'],
-                    name=row['name'],
-                    category=row['category'],
-                    description=row['description']
-                )
-            print(f"Loaded {len(df)} concepts from {filepath}")
+            self.add_concepts_batch(columns['id'], columns['name'],
+                                    columns['category'], columns['description'])
+            print(f"Loaded {len(columns['id'])} concepts from {filepath}")
         except FileNotFoundError:
             print(f"Error: File {filepath} not found")
             raise
@@ -63,50 +406,176 @@ class LeonardoKnowledgeGraph:
         filepath : str
             Path to the CSV file containing relationships.
             Expected columns: source, target, relationship, weight
+        
+        Notes
+        -----
+        Weights keep their full precision on the edges of ``graph``. They
+        are narrowed to float32 once, when the CSR arrays are rebuilt at
+        the end of loading, and PageRank, shortest paths and the MST all
+        read that float32 copy.
         """
         try:
-            df = pd.read_csv(filepath)
+            columns = _read_csv_columns(filepath, _RELATIONSHIP_DTYPES)
             
-            for _, row in df.iterrows():
-                self.graph.add_edge(
-                    row['source'],
-                    row['target'],
-                    relationship=row['relationship'],
-                    weight=row['weight']
-                )
-            print(f"Loaded {len(df)} relationships from {filepath}")
+            self.add_relationships_batch(columns['source'], columns['target'],
+                                         columns['relationship'], columns['weight'])
+            self.build_csr()
+            print(f"Loaded {len(columns['source'])} relationships from {filepath}")
         except FileNotFoundError:
             print(f"Error: File {filepath} not found")
             raise
     
+    def _invalidate_caches(self) -> None:
+        """Drop derived representations after the graph has changed."""
+        self._igraph = None
+        self._csr = None
+        self._predecessors = {}
+        self._version += 1
+        self._cache.clear()
+    
+    @_memoize
+    def _undirected_coalesced(self) -> nx.Graph:
+        """
+        Return the undirected projection of the graph with the weights of
+        antiparallel edges summed.
+        
+        ``to_undirected`` keeps only one of (u, v) and (v, u), so its weights
+        understate the pair's total connection strength in modularity.
+        """
+        weights: Dict[Tuple[str, str], float] = {}
+        for u, v, weight in self.graph.edges(data='weight', default=1.0):
+            key = (u, v) if u < v else (v, u)
+            weights[key] = weights.get(key, 0.0) + weight
+        
+        undirected_graph = nx.Graph()
+        undirected_graph.add_nodes_from(self.graph)
+        undirected_graph.add_weighted_edges_from((u, v, w) for (u, v), w in weights.items())
+        return undirected_graph
+    
+    @_memoize
+    def _graph_fingerprint(self) -> bytes:
+        """Hash the nodes and weighted edges of the graph."""
+        digest = hashlib.blake2b(digest_size=16)
+        for node in sorted(repr(node) for node in self.graph.nodes()):
+            digest.update(node.encode())
+        digest.update(b'|')
+        for edge in sorted(repr(edge) for edge in self.graph.edges(data='weight')):
+            digest.update(edge.encode())
+        return digest.digest()
+    
+    @_memoize
+    def _giant_component(self) -> nx.DiGraph:
+        """
+        Return a read-only subgraph view of the largest weakly connected
+        component.
+        """
+        if self.graph.number_of_nodes() == 0:
+            return self.graph.subgraph([])
+        return self.graph.subgraph(max(nx.weakly_connected_components(self.graph), key=len))
+    
+    def _get_igraph(self) -> "igraph.Graph":
+        """
+        Return an igraph copy of the graph, building it on first use.
+        
+        The original node IDs are kept in the ``_nx_name`` vertex attribute.
+        """
+        if self._igraph is None:
+            self._igraph = igraph.Graph.from_networkx(self.graph)
+        return self._igraph
+    
+    def _igraph_scores(self, scores: List[float]) -> Dict[str, float]:
+        """Map per-vertex igraph scores back to node IDs."""
+        return dict(zip(self._get_igraph().vs['_nx_name'], scores))
+    
+    def build_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, int]]:
+        """
+        Build the weighted CSR adjacency arrays of the graph.
+        
+        The arrays are built at the end of ``load_relationships`` (or on
+        first use after ``add_relationships_batch``, which leaves them to be
+        rebuilt lazily so streamed batches stay cheap) and cached, so degree centrality, PageRank, shortest paths and the
+        MST all read the same compact structure-of-arrays layout instead of
+        the NetworkX dict-of-dicts.
+        
+        Returns
+        -------
+        tuple
+            ``(indptr, indices, weights, node_index)`` as int32, int32 and
+            float32 arrays, where ``node_index`` maps node ID to its row
+        """
+        if self._csr is None:
+            nodes = list(self.graph.nodes())
+            node_index = {node: i for i, node in enumerate(nodes)}
+            
+            # Successors are already bucketed by source, so one pass over the
+            # adjacency fills the column and weight arrays row by row
+            row_lengths = [0]
+            columns = []
+            weights = []
+            for _, successors in self.graph.adjacency():
+                row_lengths.append(len(successors))
+                for target, data in successors.items():
+                    columns.append(node_index[target])
+                    weights.append(data.get('weight', 1.0))
+            
+            indptr = np.cumsum(row_lengths, dtype=np.int32)
+            indices = np.array(columns, dtype=np.int32)
+            data = np.array(weights, dtype=np.float32)
+            self._nodes = nodes
+            self._node_index = node_index
+            self._csr = (indptr, indices, data, node_index)
+        return self._csr
+    
+    @property
+    def csr(self) -> sparse.csr_matrix:
+        """Weighted adjacency matrix as a SciPy CSR view of ``build_csr``'s arrays."""
+        return self._csr_matrix()[1]
+    
+    @_memoize
+    def _csr_matrix(self) -> Tuple[List[str], sparse.csr_matrix]:
+        """
+        Return the node order and the CSR adjacency matrix.
+        
+        The matrix wraps the cached arrays without copying and is itself
+        cached for the current graph version, so every centrality, path and
+        MST computation shares a single instance.
+        """
+        indptr, indices, weights, node_index = self.build_csr()
+        n = len(node_index)
+        return self._nodes, sparse.csr_matrix((weights, indices, indptr), shape=(n, n), copy=False)
+    
+    @_memoize
     def get_basic_stats(self) -> Dict[str, Any]:
         """
         Get basic statistics about the graph.
         
+        The edge and weakly connected component counts are maintained by
+        the batch loaders as data arrives, so no traversal of the graph is
+        needed here.
+        
         Returns
         -------
         dict
             Dictionary containing graph statistics
         """
+        n, m, components = self.graph.number_of_nodes(), self._n_edges, self._n_components
         stats = {
-            "Number of nodes": self.graph.number_of_nodes(),
-            "Number of edges": self.graph.number_of_edges(),
-            "Density": nx.density(self.graph),
-            "Is directed": nx.is_directed(self.graph),
-            "Number of weakly connected components": nx.number_weakly_connected_components(self.graph),
+            "Number of nodes": n,
+            "Number of edges": m,
+            "Density": m / (n * (n - 1)) if n > 1 else 0,
+            "Is directed": self.graph.is_directed(),
+            "Number of weakly connected components": components,
         }
         
-        # Calculate average degree
-        if self.graph.number_of_nodes() > 0:
-            degrees = [d for _, d in self.graph.degree()]
-            stats["Average degree"] = sum(degrees) / len(degrees)
+        # Every edge adds one to an out-degree and one to an in-degree
+        if n > 0:
+            stats["Average degree"] = 2 * m / n
         
-        # Check connectivity
-        if nx.is_directed(self.graph):
-            stats["Is weakly connected"] = nx.is_weakly_connected(self.graph)
+        stats["Is weakly connected"] = components == 1
         
         return stats
     
+    @_memoize
     def calculate_degree_centrality(self) -> Dict[str, float]:
         """
         Calculate degree centrality for all nodes.
@@ -114,48 +583,284 @@ class LeonardoKnowledgeGraph:
         Returns
         -------
         dict
-            Dictionary mapping node ID to degree centrality score
+            Dictionary mapping node ID to degree centrality score,
+            computed in single precision
         """
-        return nx.degree_centrality(self.graph)
+        indptr, indices, _, node_index = self.build_csr()
+        n = len(node_index)
+        if n <= 1:
+            return dict.fromkeys(node_index, 1.0)
+        
+        # Out-degree is the row length, in-degree the column occurrence count
+        degrees = np.diff(indptr) + np.bincount(indices, minlength=n)
+        scores = (degrees / (n - 1)).astype(np.float32)
+        return dict(zip(node_index, scores.tolist()))
     
-    def calculate_betweenness_centrality(self) -> Dict[str, float]:
+    @_memoize
+    @_disk_cached
+    def calculate_betweenness_centrality(self, k: Optional[int] = None) -> Dict[str, float]:
         """
         Calculate betweenness centrality for all nodes.
         
+        Only the largest weakly connected component is searched: nodes
+        outside it score 0, and scores inside it are normalized by the size
+        of the whole graph. Exact betweenness costs O(V*E); with igraph it
+        runs in C at any size. Without igraph, graphs with more than
+        ``APPROX_BETWEENNESS_THRESHOLD`` nodes are approximated by default
+        from ``k = max(100, 0.1 * V)`` randomly sampled source nodes (fixed
+        seed), which reduces the cost to O(k*E).
+        
+        Parameters
+        ----------
+        k : int, optional
+            Number of sampled source nodes; None selects exact betweenness,
+            except for large graphs without igraph, which use the default
+            sample size
+            
+        Returns
+        -------
+        dict
+            Dictionary mapping node ID to betweenness centrality score
+        """
+        giant = self._giant_component()
+        n, n_sub = self.graph.number_of_nodes(), giant.number_of_nodes()
+        if k is None and igraph is None and n > APPROX_BETWEENNESS_THRESHOLD:
+            k = max(100, int(0.1 * n))
+        
+        betweenness = dict.fromkeys(self.graph, 0.0)
+        if k is None and igraph is not None:
+            ig = self._get_igraph()
+            if n_sub < n:
+                ig = ig.induced_subgraph([v.index for v in ig.vs if v['_nx_name'] in giant])
+            scores = ig.betweenness(directed=True)
+            if n > 2:
+                scale = 1.0 / ((n - 1) * (n - 2))
+                scores = [score * scale for score in scores]
+            betweenness.update(zip(ig.vs['_nx_name'], scores))
+            return betweenness
+        
+        if k is not None:
+            k = min(k, n_sub)
+        scores = nx.betweenness_centrality(giant, k=k, normalized=True, seed=42)
+        if n_sub < n and n_sub > 2:
+            # Re-normalize from the component's size to the whole graph's
+            scale = (n_sub - 1) * (n_sub - 2) / ((n - 1) * (n - 2))
+            scores = {node: score * scale for node, score in scores.items()}
+        betweenness.update(scores)
+        return betweenness
+    
+    @_memoize
+    @_disk_cached
+    def calculate_betweenness_parallel(self, n_workers: Optional[int] = None,
+                                       chunk_size: int = 64) -> Dict[str, float]:
+        """
+        Calculate betweenness centrality using several processes.
+        
+        Brandes' algorithm sums independent contributions from each source
+        node, so the sources are split into chunks that are processed in
+        parallel and the partial scores are added together. The result is
+        always exact and matches ``calculate_betweenness_centrality`` with
+        exact scores, including the restriction to the largest weakly
+        connected component; it differs from the serial method's sampled
+        default for graphs above ``APPROX_BETWEENNESS_THRESHOLD`` nodes
+        when igraph is not installed.
+        
+        Parameters
+        ----------
+        n_workers : int, optional
+            Number of worker processes (default=number of CPUs)
+        chunk_size : int, optional
+            Number of source nodes per task (default=64)
+            
         Returns
         -------
         dict
             Dictionary mapping node ID to betweenness centrality score
         """
-        return nx.betweenness_centrality(self.graph, normalized=True)
+        # Paths from sources in the giant component never leave it
+        sources = list(self._giant_component())
+        chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+        
+        betweenness = dict.fromkeys(self.graph, 0.0)
+        with multiprocessing.Pool(n_workers, initializer=_init_betweenness_worker,
+                                  initargs=(self._graph,)) as pool:
+            for partial in pool.imap_unordered(_betweenness_chunk, chunks):
+                for node, score in partial.items():
+                    betweenness[node] += score
+        
+        n = self.graph.number_of_nodes()
+        if n > 2:
+            scale = 1.0 / ((n - 1) * (n - 2))
+            for node in betweenness:
+                betweenness[node] *= scale
+        return betweenness
     
+    @_memoize
+    @_disk_cached
     def calculate_closeness_centrality(self) -> Dict[str, float]:
         """
         Calculate closeness centrality for all nodes.
         
+        Like betweenness, only the largest weakly connected component is
+        searched: nodes outside it score 0, and scores inside it use the
+        Wasserman-Faust scaling of the whole graph.
+        
         Returns
         -------
         dict
             Dictionary mapping node ID to closeness centrality score
         """
-        return nx.closeness_centrality(self.graph)
+        giant = self._giant_component()
+        n, n_sub = self.graph.number_of_nodes(), giant.number_of_nodes()
+        
+        closeness = dict.fromkeys(self.graph, 0.0)
+        scores = nx.closeness_centrality(giant)
+        if n_sub < n:
+            scale = (n_sub - 1) / (n - 1)
+            scores = {node: score * scale for node, score in scores.items()}
+        closeness.update(scores)
+        return closeness
+    
+    def compute_all_centralities(self, workers: int = 4,
+                                 betweenness_k: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Calculate degree, betweenness, closeness and PageRank concurrently.
+        
+        The measures are independent, so each runs in its own process. The
+        knowledge graph is pickled once, without its derived caches, and
+        unpickled once per worker by the pool initializer rather than once
+        per task. The results are stored in the in-memory cache, so later
+        calls to the individual ``calculate_*`` methods return them directly.
+        
+        Parameters
+        ----------
+        workers : int, optional
+            Number of worker processes (default=4)
+        betweenness_k : int, optional
+            Number of sampled source nodes for betweenness, passed on to
+            ``calculate_betweenness_centrality`` (default=None)
+            
+        Returns
+        -------
+        dict
+            Dictionary mapping 'degree', 'betweenness', 'closeness' and
+            'pagerank' to the corresponding node ID to score dictionaries
+        """
+        tasks = {
+            'degree': ('calculate_degree_centrality', {}),
+            'betweenness': ('calculate_betweenness_centrality',
+                            {} if betweenness_k is None else {'k': betweenness_k}),
+            'closeness': ('calculate_closeness_centrality', {}),
+            'pagerank': ('calculate_pagerank', {}),
+        }
+        
+        payload = pickle.dumps(self, protocol=5)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_centrality_worker,
+                                 initargs=(payload,)) as executor:
+            futures = {measure: executor.submit(_run_centrality, method, kwargs)
+                       for measure, (method, kwargs) in tasks.items()}
+            results = {measure: future.result() for measure, future in futures.items()}
+        
+        for measure, (method, kwargs) in tasks.items():
+            self._cache[_memo_key(method, self._version, (), kwargs)] = results[measure]
+        return results
     
-    def calculate_pagerank(self, alpha: float = 0.85) -> Dict[str, float]:
+    @_memoize
+    @_disk_cached
+    def calculate_pagerank(self, alpha: float = 0.85, max_iter: Optional[int] = None,
+                           tol: Optional[float] = None) -> Dict[str, float]:
         """
         Calculate PageRank for all nodes.
         
+        With igraph installed and no iteration limits given, PageRank is
+        solved directly by igraph's PRPACK backend. Otherwise it is computed
+        by power iteration on the cached CSR adjacency matrix, with the same
+        weighting, dangling node handling and stopping rule as
+        ``nx.pagerank``. Scores are returned in single precision either way.
+        
         Parameters
         ----------
         alpha : float, optional
             Damping parameter (default=0.85)
+        max_iter : int, optional
+            Maximum number of power iterations (default=None, 100 when
+            power iteration is used); giving it forces power iteration
+        tol : float, optional
+            Convergence tolerance per node (default=None, 1e-6 when power
+            iteration is used); giving it forces power iteration
             
         Returns
         -------
         dict
             Dictionary mapping node ID to PageRank score
         """
-        return nx.pagerank(self.graph, alpha=alpha)
+        if igraph is not None and max_iter is None and tol is None:
+            ig = self._get_igraph()
+            # Edgeless graphs have no 'weight' attribute in igraph
+            if ig.ecount() > 0:
+                scores = ig.pagerank(directed=True, damping=alpha, weights='weight')
+                return self._igraph_scores(np.asarray(scores, dtype=np.float32).tolist())
+        
+        max_iter = 100 if max_iter is None else max_iter
+        tol = 1.0e-6 if tol is None else tol
+        
+        nodes, adjacency = self._csr_matrix()
+        n = len(nodes)
+        if n == 0:
+            return {}
+        
+        out_strength = np.asarray(adjacency.sum(axis=1), dtype=np.float64).ravel()
+        dangling = out_strength == 0
+        inv_strength = np.divide(1.0, out_strength, out=np.zeros(n), where=~dangling)
+        transposed = adjacency.T.tocsr()
+        
+        x = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            x_last = x
+            x = alpha * (transposed @ (x * inv_strength) + x[dangling].sum() / n) + (1 - alpha) / n
+            if np.abs(x - x_last).sum() < n * tol:
+                # Iterate in float64 for convergence, report in float32
+                return dict(zip(nodes, x.astype(np.float32).tolist()))
+        raise nx.PowerIterationFailedConvergence(max_iter)
+    
+    @staticmethod
+    def _probe_louvain_backend() -> str:
+        """Pick the Louvain implementation once: 'igraph' or 'networkx'."""
+        return 'igraph' if igraph is not None else 'networkx'
+    
+    def _igraph_communities(self, method: str) -> List[List[str]]:
+        """
+        Run igraph's multilevel (Louvain) or leidenalg's Leiden algorithm.
+        
+        Both work on the undirected projection with the weights of
+        antiparallel edges summed.
+        """
+        if igraph is None:
+            raise ImportError(f"Community detection method '{method}' requires igraph")
+        if method == 'leiden' and leidenalg is None:
+            raise ImportError("Community detection method 'leiden' requires leidenalg")
+        
+        ig = self._get_igraph()
+        names = ig.vs['_nx_name']
+        if ig.ecount() == 0:
+            # No edges (and no 'weight' attribute): every node is its own community
+            return [[name] for name in names]
+        
+        undirected_ig = ig.as_undirected(combine_edges={'weight': 'sum'})
+        if method == 'leiden':
+            clustering = leidenalg.find_partition(
+                undirected_ig, leidenalg.ModularityVertexPartition, weights='weight', seed=42)
+        else:
+            # community_multilevel takes no seed; fix igraph's RNG for the call
+            igraph.set_random_number_generator(random.Random(42))
+            try:
+                clustering = undirected_ig.community_multilevel(weights='weight')
+            finally:
+                igraph.set_random_number_generator(random)
+        
+        return [[names[v] for v in cluster] for cluster in clustering]
     
+    @_disk_cached
     def detect_communities(self, method: str = 'louvain') -> List[List[str]]:
         """
         Detect communities in the graph.
@@ -163,7 +868,16 @@ class LeonardoKnowledgeGraph:
         Parameters
         ----------
         method : str, optional
-            'louvain' or 'greedy' (default='louvain')
+            'louvain', 'igraph_louvain', 'leiden' or 'greedy'
+            (default='louvain'). 'louvain' uses the backend chosen when
+            the graph was created: igraph when installed, NetworkX
+            otherwise. 'igraph_louvain' requires igraph and 'leiden'
+            requires igraph and leidenalg.
+        
+        Raises
+        ------
+        ImportError
+            If igraph or leidenalg is missing for the requested method
             
         Returns
         -------
@@ -171,51 +885,115 @@ class LeonardoKnowledgeGraph:
             List of communities, each containing node IDs
         """
         if method == 'louvain':
-            try:
-                # Convert to undirected for Louvain
-                undirected_graph = self.graph.to_undirected()
-                partition = community_louvain.best_partition(undirected_graph)
-                
-                # Organize nodes by community
-                communities_dict = {}
-                for node, community_id in partition.items():
-                    if community_id not in communities_dict:
-                        communities_dict[community_id] = []
-                    communities_dict[community_id].append(node)
-                
-                return list(communities_dict.values())
-            except Exception as e:
-                print(f"Louvain method failed: {e}. Falling back to greedy modularity.")
-                return self.detect_communities('greedy')
+            if self._louvain_backend == 'igraph':
+                return self._igraph_communities('igraph_louvain')
+            
+            communities = nx.community.louvain_communities(
+                self._undirected_coalesced(), weight='weight', resolution=1, seed=42)
+            return [list(community) for community in communities]
+        
+        elif method in ('igraph_louvain', 'leiden'):
+            return self._igraph_communities(method)
         
         elif method == 'greedy':
             # Greedy modularity communities
-            undirected_graph = self.graph.to_undirected()
+            undirected_graph = self._undirected_coalesced()
             communities = list(nx.algorithms.community.greedy_modularity_communities(
                 undirected_graph))
             return [list(community) for community in communities]
     
-    def find_shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+    def find_shortest_path(self, source: str, target: str,
+                           weight: Optional[str] = None) -> Optional[List[str]]:
         """
         Find shortest path between two nodes.
         
+        Unweighted queries use a bidirectional BFS that searches from both
+        ends and stops where the frontiers meet; weighted queries use
+        Dijkstra's algorithm.
+        
         Parameters
         ----------
         source : str
             Source node ID
         target : str
             Target node ID
+        weight : str, optional
+            Edge attribute to use as distance (default=None, hop count)
             
         Returns
         -------
         list or None
-            List of node IDs in the path, or None if no path exists
+            List of node IDs in the path, or None if no path exists or
+            either node is not in the graph
         """
         try:
-            return nx.shortest_path(self.graph, source=source, target=target)
-        except nx.NetworkXNoPath:
+            if weight is None:
+                return nx.bidirectional_shortest_path(self.graph, source, target)
+            return nx.shortest_path(self.graph, source=source, target=target,
+                                    weight=weight, method='dijkstra')
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
             return None
     
+    def find_shortest_paths(self, sources: List[str], targets: List[str],
+                            weighted: bool = False) -> Dict[Tuple[str, str], Optional[List[str]]]:
+        """
+        Find shortest paths from several sources to several targets at once.
+        
+        All sources are searched in a single ``scipy.sparse.csgraph.dijkstra``
+        call on the cached CSR adjacency matrix. The predecessor trees are
+        kept, so later queries from the same sources need no new search.
+        
+        Parameters
+        ----------
+        sources : list of str
+            Source node IDs
+        targets : list of str
+            Target node IDs
+        weighted : bool, optional
+            Use edge weights as distances instead of hop counts (default=False)
+            
+        Returns
+        -------
+        dict
+            Dictionary mapping each (source, target) pair to the list of node
+            IDs in the path, or None if no path exists or either node is not
+            in the graph
+        """
+        nodes, adjacency = self._csr_matrix()
+        node_index = self._node_index
+        
+        missing = [s for s in dict.fromkeys(sources)
+                   if s in node_index and (s, weighted) not in self._predecessors]
+        if missing:
+            _, predecessors = dijkstra(adjacency, directed=True, unweighted=not weighted,
+                                       indices=[node_index[s] for s in missing],
+                                       return_predecessors=True)
+            for source, row in zip(missing, predecessors):
+                self._predecessors[(source, weighted)] = row
+        
+        paths = {}
+        for source in sources:
+            if source not in node_index:
+                paths.update(((source, target), None) for target in targets)
+                continue
+            row = self._predecessors[(source, weighted)]
+            source_idx = node_index[source]
+            for target in targets:
+                if target not in node_index:
+                    paths[(source, target)] = None
+                    continue
+                current = node_index[target]
+                if current != source_idx and row[current] < 0:
+                    paths[(source, target)] = None
+                    continue
+                path = [current]
+                while current != source_idx:
+                    current = row[current]
+                    path.append(current)
+                paths[(source, target)] = [nodes[i] for i in reversed(path)]
+        return paths
+    
+    @_memoize
     def calculate_mst(self) -> List[Tuple[str, str]]:
         """
         Calculate Minimum Spanning Tree (MST) for the graph.
@@ -224,14 +1002,31 @@ class LeonardoKnowledgeGraph:
         -------
         list of tuples
             List of edges in the MST
+        
+        Notes
+        -----
+        Edge directions are ignored. When two concepts are linked in both
+        directions, the pair's weight is the sum of the two weights, as in
+        community detection. Self-loops are ignored.
         """
-        # Convert to undirected and use weights
-        undirected_graph = nx.Graph()
-        for u, v, data in self.graph.edges(data=True):
-            undirected_graph.add_edge(u, v, weight=data.get('weight', 1.0))
+        nodes, adjacency = self._csr_matrix()
+        n = len(nodes)
+        
+        # Key every edge by its unordered concept pair (upper triangle) and
+        # sum the weights per pair, so each pair enters the search once
+        coo = adjacency.tocoo()
+        lower, upper = np.minimum(coo.row, coo.col), np.maximum(coo.row, coo.col)
+        keep = lower != upper
+        keys = lower[keep].astype(np.int64) * n + upper[keep]
+        pairs, inverse = np.unique(keys, return_inverse=True)
+        weights = np.bincount(inverse, weights=coo.data[keep], minlength=len(pairs))
         
-        mst = nx.minimum_spanning_tree(undirected_graph)
-        return list(mst.edges())
+        # csgraph treats zeros as missing edges; nudge zero-weight pairs
+        # to the smallest positive float so they stay in the forest
+        weights[weights == 0] = np.finfo(np.float64).tiny
+        symmetric = sparse.csr_matrix((weights, (pairs // n, pairs % n)), shape=(n, n))
+        mst = minimum_spanning_tree(symmetric).tocoo()
+        return [(nodes[u], nodes[v]) for u, v in zip(mst.row.tolist(), mst.col.tolist())]
     
     def get_node_info(self, node_id: str) -> Dict[str, Any]:
         """
@@ -250,15 +1045,28 @@ class LeonardoKnowledgeGraph:
         if node_id not in self.graph:
             raise ValueError(f"Node {node_id} not found in graph")
         
-        info = self.graph.nodes[node_id].copy()
-        info['degree'] = self.graph.degree(node_id)
-        info['in_degree'] = self.graph.in_degree(node_id)
-        info['out_degree'] = self.graph.out_degree(node_id)
-        info['neighbors'] = list(self.graph.neighbors(node_id))
+        idx = self._id_to_idx.get(node_id)
+        if idx is None:
+            info = self.graph.nodes[node_id].copy()
+        else:
+            info = {
+                'name': self._meta['name'][idx],
+                'category': self._category_labels[self._meta['category'][idx]],
+                'description': self._meta['description'][idx],
+            }
+        
+        # Two adjacency lookups give all the degree and neighbor fields
+        successors = self.graph.succ[node_id]
+        predecessors = self.graph.pred[node_id]
+        info['degree'] = len(predecessors) + len(successors)
+        info['in_degree'] = len(predecessors)
+        info['out_degree'] = len(successors)
+        info['neighbors'] = list(successors)
         
         return info
     
-    def export_to_gexf(self, filepath: str) -> None:
+    def export_to_gexf(self, filepath: str, compress: Optional[bool] = None,
+                       pretty: bool = False) -> None:
         """
         Export the graph to GEXF format for external visualization.
         
@@ -266,6 +1074,16 @@ class LeonardoKnowledgeGraph:
         ----------
         filepath : str
             Path where to save the GEXF file
+        compress : bool, optional
+            Gzip the output (default=None, compress when ``filepath`` ends
+            in ``.gz``). Compressed files can be read back with
+            ``nx.read_gexf(gzip.open(filepath))``.
+        pretty : bool, optional
+            Indent the XML (default=False, which roughly halves the file size)
         """
-        nx.write_gexf(self.graph, filepath)
-        print(f"Graph exported to {filepath}")
\ No newline at end of file
+        if compress is None:
+            compress = filepath.endswith('.gz')
+        opener = gzip.open if compress else open
+        with opener(filepath, 'wb') as f:
+            nx.write_gexf(self.graph, f, prettyprint=pretty)
+        print(f"Graph exported to {filepath}")
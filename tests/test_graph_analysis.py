@@ -0,0 +1,44 @@
+"""
+Tests for the graph analysis helpers
+====================================
+"""
+
+import os
+import sys
+import unittest
+
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from graph_analysis import compute_layout
+
+
+class TestComputeLayout(unittest.TestCase):
+    """Layout positions must keep every node visible."""
+
+    def assertDistinctPositions(self, graph):
+        pos = compute_layout(graph)
+        self.assertEqual(set(pos), set(graph))
+        positions = {tuple(round(float(c), 6) for c in xy) for xy in pos.values()}
+        self.assertEqual(len(positions), graph.number_of_nodes())
+
+    def test_disconnected_graph(self):
+        graph = nx.DiGraph([(0, 1), (1, 2)])
+        graph.add_nodes_from([3, 4, 5])
+        self.assertDistinctPositions(graph)
+
+    def test_several_components(self):
+        graph = nx.disjoint_union_all([
+            nx.gnp_random_graph(40, 0.08, seed=1, directed=True),
+            nx.gnp_random_graph(8, 0.3, seed=2, directed=True),
+            nx.empty_graph(4, create_using=nx.DiGraph),
+        ])
+        self.assertDistinctPositions(graph)
+
+    def test_connected_graph(self):
+        self.assertDistinctPositions(nx.cycle_graph(12, create_using=nx.DiGraph))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+"""
+Tests for the LeonardoKnowledgeGraph class
+==========================================
+The optimized centrality, path and statistics code is checked against the
+NetworkX reference implementations on random graphs with several
+weakly connected components.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+import networkx as nx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import leonardo_kg
+from leonardo_kg import LeonardoKnowledgeGraph
+
+
+def _random_graph(seed: int) -> nx.DiGraph:
+    """Random weighted DiGraph with a giant component, a small one and isolated nodes."""
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    for offset, size, p in ((0, 40, 0.08), (40, 8, 0.3), (48, 4, 0.0)):
+        part = nx.gnp_random_graph(size, p, seed=rng.randrange(2**32), directed=True)
+        graph.add_nodes_from(f"C{offset + node}" for node in part)
+        graph.add_weighted_edges_from(
+            (f"C{offset + u}", f"C{offset + v}", round(rng.uniform(0.5, 3.0), 1))
+            for u, v in part.edges())
+    return graph
+
+
+def _make_kg(graph: nx.DiGraph, batches: int = 1) -> LeonardoKnowledgeGraph:
+    """Load ``graph`` into a knowledge graph through the batch API."""
+    nodes = list(graph)
+    edges = list(graph.edges(data='weight'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        kg = LeonardoKnowledgeGraph()
+        kg.add_concepts_batch(nodes, nodes, ['Art'] * len(nodes), [''] * len(nodes))
+        for i in range(batches):
+            chunk = edges[i::batches]
+            if chunk:
+                sources, targets, weights = zip(*chunk)
+                kg.add_relationships_batch(sources, targets, ['related'] * len(chunk), weights)
+    return kg
+
+
+class TestCentrality(unittest.TestCase):
+    """Centrality measures against NetworkX."""
+
+    def setUp(self):
+        self.graph = _random_graph(seed=1)
+        self.kg = _make_kg(self.graph)
+
+    def assertScoresAlmostEqual(self, scores, expected, places=5):
+        self.assertEqual(set(scores), set(expected))
+        for node, value in expected.items():
+            self.assertAlmostEqual(scores[node], value, places=places, msg=node)
+
+    def test_degree_centrality(self):
+        self.assertScoresAlmostEqual(self.kg.calculate_degree_centrality(),
+                                     nx.degree_centrality(self.graph))
+
+    def test_pagerank_power_iteration(self):
+        with mock.patch.object(leonardo_kg, 'igraph', None):
+            scores = self.kg.calculate_pagerank()
+        self.assertScoresAlmostEqual(scores, nx.pagerank(self.graph))
+
+    def test_pagerank_default_backend(self):
+        # igraph solves PageRank directly, so compare with a converged reference
+        self.assertScoresAlmostEqual(self.kg.calculate_pagerank(),
+                                     nx.pagerank(self.graph, tol=1e-12, max_iter=1000))
+
+    def test_pagerank_without_edges(self):
+        kg = _make_kg(nx.empty_graph(['A', 'B', 'C', 'D'], create_using=nx.DiGraph))
+        self.assertScoresAlmostEqual(kg.calculate_pagerank(), dict.fromkeys('ABCD', 0.25))
+
+    def _giant_reference(self, function):
+        """Reference scores computed on the whole graph, zero outside the giant component."""
+        giant = max(nx.weakly_connected_components(self.graph), key=len)
+        reference = function(self.graph)
+        return {node: reference[node] if node in giant else 0.0 for node in self.graph}
+
+    def test_betweenness_giant_component(self):
+        expected = self._giant_reference(nx.betweenness_centrality)
+        self.assertScoresAlmostEqual(self.kg.calculate_betweenness_centrality(), expected)
+        with mock.patch.object(leonardo_kg, 'igraph', None):
+            kg = _make_kg(self.graph)
+            self.assertScoresAlmostEqual(kg.calculate_betweenness_centrality(), expected)
+
+    def test_betweenness_parallel(self):
+        self.assertScoresAlmostEqual(self.kg.calculate_betweenness_parallel(n_workers=2),
+                                     self._giant_reference(nx.betweenness_centrality))
+
+    def test_closeness_giant_component(self):
+        self.assertScoresAlmostEqual(self.kg.calculate_closeness_centrality(),
+                                     self._giant_reference(nx.closeness_centrality))
+
+
+class TestShortestPaths(unittest.TestCase):
+    """Batched shortest paths against NetworkX."""
+
+    def setUp(self):
+        self.graph = _random_graph(seed=2)
+        self.kg = _make_kg(self.graph)
+        self.sources = ['C0', 'C5', 'C41', 'C50']
+        self.targets = ['C3', 'C17', 'C44', 'C0', 'C50']
+
+    def _check(self, weighted):
+        weight = 'weight' if weighted else None
+        paths = self.kg.find_shortest_paths(self.sources, self.targets, weighted=weighted)
+        for source in self.sources:
+            for target in self.targets:
+                path = paths[(source, target)]
+                if not nx.has_path(self.graph, source, target):
+                    self.assertIsNone(path)
+                    continue
+                self.assertEqual((path[0], path[-1]), (source, target))
+                self.assertTrue(nx.is_path(self.graph, path))
+                self.assertAlmostEqual(
+                    nx.path_weight(self.graph, path, 'weight') if weighted else len(path) - 1,
+                    nx.shortest_path_length(self.graph, source, target, weight=weight),
+                    places=4)
+
+    def test_unweighted_paths(self):
+        self._check(weighted=False)
+
+    def test_weighted_paths(self):
+        self._check(weighted=True)
+
+    def test_unknown_nodes(self):
+        paths = self.kg.find_shortest_paths(['C0', 'missing'], ['C0', 'gone'])
+        self.assertEqual(paths[('C0', 'C0')], ['C0'])
+        self.assertIsNone(paths[('C0', 'gone')])
+        self.assertIsNone(paths[('missing', 'C0')])
+        self.assertIsNone(paths[('missing', 'gone')])
+        self.assertIsNone(self.kg.find_shortest_path('C0', 'gone'))
+
+
+class TestMinimumSpanningTree(unittest.TestCase):
+    """MST against NetworkX on the summed undirected projection."""
+
+    def _reference(self, graph):
+        undirected = nx.Graph()
+        undirected.add_nodes_from(graph)
+        for u, v, weight in graph.edges(data='weight'):
+            if u != v:
+                previous = undirected.get_edge_data(u, v, {'weight': 0.0})['weight']
+                undirected.add_edge(u, v, weight=previous + weight)
+        return undirected, nx.minimum_spanning_tree(undirected)
+
+    def _check(self, graph):
+        undirected, reference = self._reference(graph)
+        edges = _make_kg(graph).calculate_mst()
+        self.assertEqual(len(edges), reference.number_of_edges())
+        self.assertEqual({node for edge in edges for node in edge},
+                         {node for edge in reference.edges() for node in edge})
+        self.assertAlmostEqual(sum(undirected[u][v]['weight'] for u, v in edges),
+                               reference.size(weight='weight'), places=4)
+
+    def test_random_graph(self):
+        for seed in range(3):
+            self._check(_random_graph(seed))
+
+    def test_zero_weight_edges(self):
+        graph = nx.DiGraph()
+        graph.add_weighted_edges_from([('A', 'B', 0.0), ('B', 'C', 1.0),
+                                       ('C', 'D', 2.0), ('D', 'C', -2.0)])
+        self._check(graph)
+        self.assertEqual({frozenset(edge) for edge in _make_kg(graph).calculate_mst()},
+                         {frozenset('AB'), frozenset('BC'), frozenset('CD')})
+
+
+class TestBasicStats(unittest.TestCase):
+    """Incrementally maintained statistics against NetworkX."""
+
+    def test_counters_across_batches(self):
+        for seed in range(5):
+            graph = _random_graph(seed)
+            stats = _make_kg(graph, batches=4).get_basic_stats()
+            self.assertEqual(stats["Number of nodes"], graph.number_of_nodes())
+            self.assertEqual(stats["Number of edges"], graph.number_of_edges())
+            self.assertEqual(stats["Number of weakly connected components"],
+                             nx.number_weakly_connected_components(graph))
+            self.assertAlmostEqual(stats["Density"], nx.density(graph))
+
+    def test_duplicate_edges_counted_once(self):
+        kg = _make_kg(nx.DiGraph([('A', 'B')]))
+        with contextlib.redirect_stdout(io.StringIO()):
+            kg.add_relationships_batch(['A', 'B'], ['B', 'A'], ['related'] * 2, [1.0, 1.0])
+        stats = kg.get_basic_stats()
+        self.assertEqual(stats["Number of edges"], 2)
+        self.assertEqual(stats["Number of weakly connected components"], 1)
+
+    def test_graph_is_read_only(self):
+        kg = _make_kg(_random_graph(seed=0))
+        with self.assertRaises(nx.NetworkXError):
+            kg.graph.add_edge('C0', 'C1')
+
+
+if __name__ == '__main__':
+    unittest.main()